@@ -1,9 +1,8 @@
-from flask import Flask, request, jsonify
-from twilio.twiml.messaging_response import MessagingResponse
+from quart import Quart, Response, request, jsonify
 from twilio.rest import Client
+from xml.sax.saxutils import escape
 import os
 import asyncio
-import concurrent.futures
 from dotenv import load_dotenv
 
 from src.rag_faq_bot import RAGFAQBot
@@ -11,8 +10,8 @@ from src.conversation_logger import ConversationLogger
 
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
+# Initialize Quart app
+app = Quart(__name__)
 
 # Initialize Twilio
 twilio_client = Client(
@@ -20,49 +19,110 @@ twilio_client = Client(
     os.getenv('TWILIO_AUTH_TOKEN')
 )
 
+# Emoji shown next to each intent in replies
+INTENT_EMOJIS = {
+    'Admission_Dates': '📅',
+    'Scholarship': '💰',
+    'Fee_Structure': '💵',
+    'Hostel': '🏠',
+    'Transport': '🚌',
+    'Library': '📚',
+    'Departments': '🎓',
+    'Contact': '📞',
+    'Eligibility': '✅',
+    'Entry_Test': '📝',
+}
+
+# Fixed TwiML envelope for a single reply message
+TWIML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Message>{}</Message></Response>'
+)
+
+WELCOME_MSG = (
+    "👋 *Welcome to University FAQ Bot!*\n\n"
+    "I can help you with:\n"
+    "• Admission dates & deadlines\n"
+    "• Fee structure & scholarships\n"
+    "• Hostel & transport info\n"
+    "• Departments & programs\n"
+    "• And much more!\n\n"
+    "Ask me anything about the university!"
+)
+
+HELP_MSG = (
+    "📚 *Example Questions:*\n\n"
+    "• When do admissions open?\n"
+    "• What scholarships are available?\n"
+    "• How do I apply for hostel?\n"
+    "• What is the fee structure?\n"
+    "• Contact information?\n\n"
+    "Type 'menu' to see all topics."
+)
+
 # Initialize RAG bot (singleton)
 rag_bot = None
+rag_bot_lock = asyncio.Lock()
+menu_msg = None
 logger = ConversationLogger()
 
-def get_rag_bot():
+async def get_rag_bot():
     """Get or initialize RAG bot"""
-    global rag_bot
+    global rag_bot, menu_msg
     if rag_bot is None:
-        print("🤖 Initializing RAG FAQ Bot...")
-        rag_bot = RAGFAQBot(
-            csv_path=os.getenv('CSV_PATH', 'data/synthetic_faq_dataset.csv'),
-            use_cache=True
-        )
-        print("✅ RAG Bot Ready!")
+        async with rag_bot_lock:
+            if rag_bot is None:
+                print("🤖 Initializing RAG FAQ Bot...")
+                # Index loading is blocking; keep the event loop free meanwhile
+                rag_bot = await asyncio.to_thread(
+                    RAGFAQBot,
+                    csv_path=os.getenv('CSV_PATH', 'data/synthetic_faq_dataset.csv'),
+                    use_cache=True,
+                    semantic_cache_threshold=float(os.getenv('SIM_THRESHOLD', 0.92)),
+                    use_mmr=os.getenv('USE_MMR', 'false').lower() == 'true'
+                )
+                menu_msg = build_menu(rag_bot.get_all_intents())
+                print("✅ RAG Bot Ready!")
     return rag_bot
 
-def run_async_query(bot, question):
-    """Helper to run async query in sync context"""
-    try:
-        # Try to get existing event loop
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is running, use asyncio.run in a thread
-            def run_in_thread():
-                # Create new event loop in thread
-                new_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(new_loop)
-                try:
-                    return new_loop.run_until_complete(bot.query(question, return_sources=True))
-                finally:
-                    new_loop.close()
-            
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_in_thread)
-                return future.result()
-        else:
-            return loop.run_until_complete(bot.query(question, return_sources=True))
-    except RuntimeError:
-        # No event loop exists, create new one
-        return asyncio.run(bot.query(question, return_sources=True))
+def build_menu(intents):
+    """Build the topics menu shown for the 'menu' command"""
+    return (
+        "*📋 Available Topics:*\n\n"
+        + "\n".join(f"{i}. {intent.replace('_', ' ')}" for i, intent in enumerate(intents, 1))
+        + "\n\nAsk me about any topic!"
+    )
+
+@app.after_serving
+async def close_rag_bot():
+    """Release the bot's pooled connections on shutdown"""
+    if rag_bot is not None:
+        await rag_bot.aclose()
+
+async def welcome_command():
+    """Reply to 'hi' / 'hello' / 'hey'"""
+    return WELCOME_MSG
+
+async def help_command():
+    """Reply to 'help'"""
+    return HELP_MSG
+
+async def menu_command():
+    """Reply to 'menu'"""
+    await get_rag_bot()
+    return menu_msg
+
+# Special commands, matched against the lowercased message
+COMMANDS = {
+    'hi': welcome_command,
+    'hello': welcome_command,
+    'hey': welcome_command,
+    'help': help_command,
+    'menu': menu_command,
+}
 
 @app.route('/')
-def home():
+async def home():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
@@ -71,15 +131,16 @@ def home():
     })
 
 @app.route('/webhook', methods=['POST'])
-def webhook():
+async def webhook():
     """
     Main WhatsApp webhook endpoint
     Receives messages from Twilio and sends responses
     """
     try:
         # Get message details
-        incoming_msg = request.values.get('Body', '').strip()
-        from_number = request.values.get('From', '')
+        values = await request.values
+        incoming_msg = values.get('Body', '').strip()
+        from_number = values.get('From', '')
         user_id = from_number.replace('whatsapp:', '')
         
         print(f"📩 Received from {user_id}: {incoming_msg}")
@@ -89,43 +150,13 @@ def webhook():
             return respond_whatsapp("Please send a valid question!")
         
         # Handle special commands
-        if incoming_msg.lower() in ['hi', 'hello', 'hey']:
-            welcome_msg = (
-                "👋 *Welcome to University FAQ Bot!*\n\n"
-                "I can help you with:\n"
-                "• Admission dates & deadlines\n"
-                "• Fee structure & scholarships\n"
-                "• Hostel & transport info\n"
-                "• Departments & programs\n"
-                "• And much more!\n\n"
-                "Ask me anything about the university!"
-            )
-            return respond_whatsapp(welcome_msg)
-        
-        if incoming_msg.lower() == 'help':
-            help_msg = (
-                "📚 *Example Questions:*\n\n"
-                "• When do admissions open?\n"
-                "• What scholarships are available?\n"
-                "• How do I apply for hostel?\n"
-                "• What is the fee structure?\n"
-                "• Contact information?\n\n"
-                "Type 'menu' to see all topics."
-            )
-            return respond_whatsapp(help_msg)
-        
-        if incoming_msg.lower() == 'menu':
-            bot = get_rag_bot()
-            intents = bot.get_all_intents()
-            menu_msg = "*📋 Available Topics:*\n\n"
-            for i, intent in enumerate(intents, 1):
-                menu_msg += f"{i}. {intent.replace('_', ' ')}\n"
-            menu_msg += "\nAsk me about any topic!"
-            return respond_whatsapp(menu_msg)
+        handler = COMMANDS.get(incoming_msg.lower())
+        if handler:
+            return respond_whatsapp(await handler())
         
         # Get RAG response
-        bot = get_rag_bot()
-        result = run_async_query(bot, incoming_msg)
+        bot = await get_rag_bot()
+        result = await bot.query(incoming_msg, return_sources=True)
         
         # Validate result structure
         if not result or 'response' not in result:
@@ -145,6 +176,9 @@ def webhook():
         
         print(f"💬 Sending response: {response_text[:100]}...")
         
+        # Warm caches for likely follow-ups while the user reads the reply
+        app.add_background_task(bot.prefetch_related, result['response'].intent)
+        
         return respond_whatsapp(response_text)
     
     except Exception as e:
@@ -166,11 +200,9 @@ def respond_whatsapp(message):
         message (str): Message to send
         
     Returns:
-        str: TwiML response
+        Response: TwiML response
     """
-    resp = MessagingResponse()
-    resp.message(message)
-    return str(resp)
+    return Response(TWIML_TEMPLATE.format(escape(message)), content_type='text/xml')
 
 def format_whatsapp_response(result):
     """
@@ -187,20 +219,7 @@ def format_whatsapp_response(result):
     sources = result.get('sources', [])
     
     # Add emoji based on intent
-    intent_emojis = {
-        'Admission_Dates': '📅',
-        'Scholarship': '💰',
-        'Fee_Structure': '💵',
-        'Hostel': '🏠',
-        'Transport': '🚌',
-        'Library': '📚',
-        'Departments': '🎓',
-        'Contact': '📞',
-        'Eligibility': '✅',
-        'Entry_Test': '📝',
-    }
-    
-    emoji = intent_emojis.get(intent, 'ℹ️')
+    emoji = INTENT_EMOJIS.get(intent, 'ℹ️')
     
     # Format main response
     formatted = f"{emoji} *{intent.replace('_', ' ')}*\n\n{answer}"
@@ -211,11 +230,11 @@ def format_whatsapp_response(result):
     return formatted
 
 @app.route('/send-message', methods=['POST'])
-def send_message():
+async def send_message():
     """
     Endpoint to send proactive messages (for admin use)
     """
-    data = request.json
+    data = await request.get_json()
     to_number = data.get('to')
     message = data.get('message')
     
@@ -223,7 +242,8 @@ def send_message():
         return jsonify({"error": "Missing 'to' or 'message'"}), 400
     
     try:
-        msg = twilio_client.messages.create(
+        msg = await asyncio.to_thread(
+            twilio_client.messages.create,
             body=message,
             from_=f"whatsapp:{os.getenv('TWILIO_PHONE_NUMBER')}",
             to=f"whatsapp:{to_number}"
@@ -233,9 +253,9 @@ def send_message():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/analytics', methods=['GET'])
-def analytics():
+async def analytics():
     """Get conversation analytics"""
-    stats = logger.get_analytics()
+    stats = await asyncio.to_thread(logger.get_analytics)
     return jsonify(stats)
 
 if __name__ == '__main__':
@@ -246,4 +266,5 @@ if __name__ == '__main__':
     ║   Running on http://localhost:{port}        ║
     ╚════════════════════════════════════════════╝
     """)
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development fallback; use hypercorn.toml / Procfile in production
+    app.run(host='0.0.0.0', port=port)
@@ -24,6 +24,13 @@ async def run_interactive_chat():
     # Initialize bot
     bot = RAGFAQBot(use_cache=True)
     
+    try:
+        await chat_loop(bot)
+    finally:
+        await bot.aclose()
+
+async def chat_loop(bot):
+    """Read questions from stdin until the user quits"""
     while True:
         user_input = input("👤 You: ").strip()
         
@@ -65,7 +72,8 @@ def run_whatsapp_server():
     ╚════════════════════════════════════════════╝
     """)
     
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development fallback; use hypercorn.toml / Procfile in production
+    app.run(host='0.0.0.0', port=port)
 
 def initialize_vectorstore():
     """Initialize/rebuild vector store"""
@@ -73,7 +81,7 @@ def initialize_vectorstore():
     import shutil
     from pathlib import Path
     
-    persist_dir = Path("./chroma_db")
+    persist_dir = Path("./faiss_index")
     
     if persist_dir.exists():
         print("🗑️  Removing old vector store...")
@@ -1,51 +1,183 @@
-import pandas as pd
 from datetime import datetime
+import atexit
+import csv
 import os
+import queue
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    timestamp TEXT,
+    user_id TEXT,
+    user_question TEXT,
+    predicted_intent TEXT,
+    confidence REAL,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_logs_user_id ON logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_logs_intent ON logs(predicted_intent);
+CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(date(timestamp));
+"""
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.2  # seconds
+
+# Queued after the last row to stop the writer thread
+_STOP = object()
 
 class ConversationLogger:
     """Logs WhatsApp conversations"""
-    
-    def __init__(self, log_file='data/whatsapp_logs.csv'):
+
+    def __init__(self, log_file='data/whatsapp_logs.db'):
         self.log_file = log_file
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
+
+        # Shared by the writer thread and analytics calls, serialized by _db_lock.
+        # WAL lets several server workers append to the same file.
+        self.conn = sqlite3.connect(log_file, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._import_legacy_csv()
+
+        # Rows are queued here and written in batches by a background thread
+        self._q = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _import_legacy_csv(self):
+        """Copy rows from the CSV log used before SQLite into an empty database"""
+        csv_file = os.path.splitext(self.log_file)[0] + '.csv'
+        if not os.path.exists(csv_file):
+            return
+
+        # BEGIN IMMEDIATE takes the write lock up front, so when several server
+        # workers start together only the first one sees an empty table
         try:
-            self.logs = pd.read_csv(log_file)
-        except FileNotFoundError:
-            self.logs = pd.DataFrame(columns=[
-                'timestamp', 'user_id', 'user_question', 
-                'predicted_intent', 'confidence', 'response'
-            ])
-    
+            self.conn.execute('BEGIN IMMEDIATE')
+            if self.conn.execute('SELECT 1 FROM logs LIMIT 1').fetchone() is None:
+                with open(csv_file, newline='', encoding='utf-8') as f:
+                    rows = [
+                        [
+                            row['timestamp'] or None,
+                            row['user_id'] or None,
+                            row['user_question'] or None,
+                            row['predicted_intent'] or None,
+                            float(row['confidence']) if row['confidence'] else None,
+                            row['response'] or None
+                        ]
+                        for row in csv.DictReader(f)
+                    ]
+                self.conn.executemany('INSERT INTO logs VALUES (?, ?, ?, ?, ?, ?)', rows)
+                print(f"📥 Imported {len(rows)} log entries from {csv_file}")
+            self.conn.execute('COMMIT')
+        except (OSError, KeyError, ValueError, csv.Error, sqlite3.Error) as e:
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+            print(f"❌ Failed to import {csv_file}: {e}")
+
     def log_interaction(self, question, intent, confidence, user_id=None, response=None):
         """Log interaction"""
-        new_log = pd.DataFrame([{
-            'timestamp': datetime.now().isoformat(),
-            'user_id': user_id,
-            'user_question': question,
-            'predicted_intent': intent,
-            'confidence': confidence,
-            'response': response
-        }])
-        
-        self.logs = pd.concat([self.logs, new_log], ignore_index=True)
-        self.logs.to_csv(self.log_file, index=False)
-    
+        row = [
+            datetime.now().isoformat(),
+            user_id,
+            question,
+            intent,
+            confidence,
+            response
+        ]
+        try:
+            self._q.put_nowait(row)
+        except queue.Full:
+            print(f"⚠️ Log queue full, dropping entry for {user_id}")
+
+    def _take_batch(self, timeout=None):
+        """Collect up to BATCH_SIZE queued rows"""
+        rows = []
+        try:
+            rows.append(self._q.get(timeout=timeout))
+            while len(rows) < BATCH_SIZE:
+                rows.append(self._q.get_nowait())
+        except queue.Empty:
+            pass
+        return rows
+
+    def _write_rows(self, rows):
+        """Write a batch of rows in a single transaction"""
+        if not rows:
+            return
+        with self._db_lock:
+            try:
+                self.conn.execute('BEGIN')
+                self.conn.executemany('INSERT INTO logs VALUES (?, ?, ?, ?, ?, ?)', rows)
+                self.conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.execute('ROLLBACK')
+                print(f"❌ Failed to write {len(rows)} log entries: {e}")
+
+    def _drain(self):
+        """Background loop writing queued rows until _STOP is taken"""
+        while True:
+            batch = self._take_batch(timeout=FLUSH_INTERVAL)
+            rows = [row for row in batch if row is not _STOP]
+            self._write_rows(rows)
+            for _ in batch:
+                self._q.task_done()
+            if len(rows) < len(batch):
+                return
+
+    def flush(self):
+        """Wait until every queued row has been written"""
+        if self._thread.is_alive():
+            self._q.join()
+
+    def close(self):
+        """Write the remaining rows, stop the writer thread and close the database"""
+        if not self._thread.is_alive():
+            return
+        # The sentinel lands behind any in-flight rows, so the writer commits
+        # those before it exits
+        self._q.put(_STOP)
+        self._thread.join()
+        self.conn.close()
+
     def get_analytics(self):
         """Get analytics"""
-        if len(self.logs) == 0:
-            return {
-                'total_interactions': 0,
-                'unique_users': 0,
-                'top_intents': {}
-            }
-        
+        self.flush()
+
+        with self._db_lock:
+            total, average_confidence = self.conn.execute(
+                'SELECT COUNT(*), AVG(confidence) FROM logs'
+            ).fetchone()
+
+            if total == 0:
+                return {
+                    'total_interactions': 0,
+                    'unique_users': 0,
+                    'top_intents': {}
+                }
+
+            # COUNT(DISTINCT user_id) would sort the whole table; the subquery
+            # reads idx_logs_user_id as a covering index instead
+            unique_users = self.conn.execute(
+                'SELECT COUNT(*) FROM (SELECT DISTINCT user_id FROM logs WHERE user_id IS NOT NULL)'
+            ).fetchone()[0]
+            top_intents = self.conn.execute(
+                'SELECT predicted_intent, COUNT(*) AS n FROM logs '
+                'GROUP BY predicted_intent ORDER BY n DESC LIMIT 10'
+            ).fetchall()
+            daily_volume = self.conn.execute(
+                'SELECT date(timestamp) AS day, COUNT(*) FROM logs '
+                'GROUP BY day ORDER BY day'
+            ).fetchall()
+
         return {
-            'total_interactions': len(self.logs),
-            'unique_users': self.logs['user_id'].nunique(),
-            'average_confidence': self.logs['confidence'].mean(),
-            'top_intents': self.logs['predicted_intent'].value_counts().head(10).to_dict(),
-            'daily_volume': self.logs.groupby(
-                pd.to_datetime(self.logs['timestamp']).dt.date
-            ).size().to_dict()
-        }
\ No newline at end of file
+            'total_interactions': total,
+            'unique_users': unique_users,
+            'average_confidence': average_confidence,
+            'top_intents': dict(top_intents),
+            'daily_volume': dict(daily_volume)
+        }
@@ -1,37 +1,119 @@
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_chroma import Chroma
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 from dotenv import load_dotenv
+import faiss
+import httpx
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from pathlib import Path
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
 
 from source.schemas import FAQAIResponse
+from src.semantic_cache import SemanticCache
 
 load_dotenv()
 
+# Shortened text-embedding-3-small vectors; stored as 8-bit scalars in the index
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+# FAQ examples per intent in the (cacheable) system prompt
+EXAMPLES_PER_INTENT = 3
+
+# Likely next topics after an answer in a given intent (most likely first)
+INTENT_FOLLOW_UPS = {
+    'Admission_Dates': ('Eligibility', 'Entry_Test'),
+    'Eligibility': ('Entry_Test', 'Admission_Dates'),
+    'Entry_Test': ('Merit_List', 'Eligibility'),
+    'Merit_List': ('Fee_Structure', 'Admission_Dates'),
+    'Fee_Structure': ('Scholarship', 'Hostel'),
+    'Scholarship': ('Fee_Structure', 'Eligibility'),
+    'Hostel': ('Transport', 'Fee_Structure'),
+    'Transport': ('Hostel', 'Contact'),
+    'Departments': ('Eligibility', 'Placement'),
+    'Placement': ('Departments', 'Contact'),
+    'International': ('Eligibility', 'Fee_Structure'),
+    'Migration': ('Eligibility', 'Contact'),
+    'Examination': ('Library', 'Contact'),
+    'Library': ('Examination', 'Departments'),
+    'Contact': ('Admission_Dates', 'Departments'),
+}
+PREFETCH_INTENTS = 2
+
 class RAGFAQBot:
     """RAG-powered FAQ Bot for WhatsApp integration"""
     
     def __init__(
         self, 
         csv_path: str = "data/synthetic_faq_dataset.csv",
-        persist_directory: str = "./chroma_db",
-        use_cache: bool = True
+        persist_directory: str = "./faiss_index",
+        use_cache: bool = True,
+        response_cache_size: int = 1024,
+        response_cache_ttl: float = 3600,
+        semantic_cache_threshold: float = 0.92,
+        semantic_cache_size: int = 5000,
+        use_mmr: bool = False
     ):
         self.csv_path = csv_path
         self.persist_directory = persist_directory
         self.use_cache = use_cache
+        self.response_cache_size = response_cache_size
+        self.response_cache_ttl = response_cache_ttl
+        self.use_mmr = use_mmr
         
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        self.structured_llm = self.llm.with_structured_output(FAQAIResponse)
+        # Shared keep-alive pool so OpenAI calls reuse TLS connections
+        self._http = httpx.AsyncClient(
+            timeout=30,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+        )
+        
+        self.embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            http_async_client=self._http
+        )
+        self.llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            temperature=0,
+            http_async_client=self._http
+        )
+        # Strict JSON-schema output: the model emits valid FAQAIResponse JSON directly
+        self.structured_llm = self.llm.with_structured_output(
+            FAQAIResponse,
+            method="json_schema",
+            strict=True
+        )
         
         self.vectorstore = None
         self.retriever = None
+        self.rag_prompt = None
+        self._intents_cache = None
+        self._canonical_questions = {}
+        self._prefetching = set()
         self.faq_df = None
         
+        # Exact-match response cache: normalized question -> (timestamp, result)
+        self._exact_cache = OrderedDict()
+        self._exact_cache_lock = threading.Lock()
+        self.semantic_cache = SemanticCache(
+            dim=EMBEDDING_DIMENSIONS,
+            threshold=semantic_cache_threshold,
+            ttl=response_cache_ttl,
+            max_size=semantic_cache_size
+        )
+        
         self._initialize()
     
     def _initialize(self):
@@ -43,7 +125,14 @@ class RAGFAQBot:
             self._load_vectorstore()
         else:
             print("🆕 Creating new vector store...")
-            self._create_vectorstore()
+            # use_cache=False asks for a fresh index even if one is on disk
+            self._create_vectorstore(replace=not self.use_cache)
+        
+        self.get_all_intents()
+        self._canonical_questions = (
+            self.faq_df.groupby('Intent', sort=False)['Question'].first().to_dict()
+        )
+        self._setup_prompt()
     
     def _load_csv_data(self):
         """Load CSV data"""
@@ -53,117 +142,266 @@ class RAGFAQBot:
     def _create_documents(self):
         """Create documents from CSV"""
         df = self._load_csv_data()
-        documents = []
+        records = (
+            df[['Intent', 'Question', 'Answer']]
+            .rename(columns=str.lower)
+            .to_dict('records')
+        )
         
-        for idx, row in df.iterrows():
-            content = f"""
-Intent: {row['Intent']}
-Question: {row['Question']}
-Answer: {row['Answer']}
-""".strip()
-            
-            doc = Document(
-                page_content=content,
-                metadata={
-                    'intent': row['Intent'],
-                    'question': row['Question'],
-                    'answer': row['Answer'],
-                }
+        return [
+            Document(
+                page_content=f"Intent: {r['intent']}\nQuestion: {r['question']}\nAnswer: {r['answer']}",
+                metadata=r
             )
-            documents.append(doc)
-        
-        return documents
+            for r in records
+        ]
     
-    def _create_vectorstore(self):
-        """Create vector store"""
+    def _create_vectorstore(self, replace: bool = False):
+        """Create vector store; replace overwrites an index already on disk"""
         documents = self._create_documents()
+        texts = [doc.page_content for doc in documents]
+        
+        # Embed the whole corpus up front (OpenAIEmbeddings batches 1000 texts per request)
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
         
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.persist_directory,
-            collection_name="faq_collection"
+        # OpenAI embeddings are unit length, so inner product is cosine similarity
+        index = faiss.IndexScalarQuantizer(
+            vectors.shape[1],
+            faiss.ScalarQuantizer.QT_8bit,
+            faiss.METRIC_INNER_PRODUCT
         )
+        index.train(vectors)
+        
+        self.vectorstore = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        self.vectorstore.add_embeddings(
+            text_embeddings=zip(texts, vectors.tolist()),
+            metadatas=[doc.metadata for doc in documents]
+        )
+        self._save_vectorstore(replace)
         self._setup_retriever()
     
+    def _save_vectorstore(self, replace: bool = False):
+        """Persist the vector store atomically; replace overwrites an index already on disk"""
+        # Server workers may build the index concurrently on first start; one
+        # that sees persist_directory must never find a half-written index.
+        persist_path = Path(self.persist_directory)
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+        build_dir = tempfile.mkdtemp(dir=persist_path.parent, prefix=f".{persist_path.name}-")
+        self.vectorstore.save_local(build_dir)
+        
+        # Only an explicit rebuild moves the old index aside, since a directory
+        # can only be renamed onto an empty one. Workers starting meanwhile find
+        # no index and build their own, so this is kept off the normal path.
+        stale_dir = None
+        if replace and persist_path.exists():
+            stale_dir = tempfile.mkdtemp(dir=persist_path.parent, prefix=f".{persist_path.name}-old-")
+            try:
+                os.replace(persist_path, stale_dir)
+            except OSError:
+                pass
+        
+        try:
+            os.replace(build_dir, persist_path)
+        except OSError:
+            # Another worker published its index first; keep that one
+            shutil.rmtree(build_dir, ignore_errors=True)
+        
+        if stale_dir is not None:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+    
     def _load_vectorstore(self):
         """Load existing vector store"""
-        self.vectorstore = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings,
-            collection_name="faq_collection"
+        # The docstore is a pickle written by _create_vectorstore
+        self.vectorstore = FAISS.load_local(
+            self.persist_directory,
+            self.embeddings,
+            allow_dangerous_deserialization=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
         )
+        # An index built before a change to EMBEDDING_DIMENSIONS can't be
+        # searched with the current query embeddings
+        if self.vectorstore.index.d != EMBEDDING_DIMENSIONS:
+            print(f"♻️ Index has {self.vectorstore.index.d} dimensions, expected {EMBEDDING_DIMENSIONS}; rebuilding...")
+            self._create_vectorstore(replace=True)
+            return
         self._setup_retriever()
     
     def _setup_retriever(self):
         """Setup retriever"""
-        self.retriever = self.vectorstore.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 3, "fetch_k": 10}
-        )
-    
-    def _format_context(self, docs):
-        """Format documents"""
-        formatted = []
-        for doc in docs:
-            formatted.append(f"""
-Intent: {doc.metadata['intent']}
-Q: {doc.metadata['question']}
-A: {doc.metadata['answer']}
-""".strip())
-        return "\n\n".join(formatted)
+        if self.use_mmr:
+            self.retriever = self.vectorstore.as_retriever(
+                search_type="mmr",
+                search_kwargs={"k": 3, "fetch_k": 10}
+            )
+        else:
+            self.retriever = self.vectorstore.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": 3}
+            )
     
-    async def query(self, question: str, return_sources: bool = False):
-        """Query the RAG system"""
-        # Retrievers are runnables, use ainvoke for async
-        retrieved_docs = await self.retriever.ainvoke(question)
+    def _setup_prompt(self):
+        """Setup RAG prompt template"""
+        # Everything that is identical across requests goes first, in the
+        # system message, so OpenAI's prompt-prefix cache can reuse it. The
+        # intent reference keeps the prefix above the 1024-token cache minimum.
+        examples = self.faq_df.groupby('Intent', sort=False).head(EXAMPLES_PER_INTENT)
+        intent_reference = "\n\n".join(
+            f"Intent: {row.Intent}\nQ: {row.Question}\nA: {row.Answer}"
+            for row in examples.itertuples()
+        )
         
-        rag_prompt = ChatPromptTemplate.from_template("""
+        system_prompt = f"""
 You are a helpful university FAQ assistant for WhatsApp.
 
-Retrieved FAQs:
-{context}
-
-User Question: {question}
-
 Instructions:
 1. Identify the correct intent category
 2. Provide a clear, concise answer (2-3 sentences max)
 3. Be conversational and friendly
-4. Use information from the FAQs
+4. Use information from the retrieved FAQs
 5. If uncertain, suggest contacting the university
 
 Format your response for WhatsApp messaging - keep it brief and helpful.
-""")
-        
-        rag_chain = (
-            {
-                "context": lambda x: self._format_context(retrieved_docs),
-                "question": RunnablePassthrough()
-            }
-            | rag_prompt
-            | self.structured_llm
+
+Intent reference (example questions for each category):
+
+{intent_reference}
+""".strip()
+        
+        # SystemMessage is passed as-is, so braces in FAQ text are not template fields
+        self.rag_prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=system_prompt),
+            ("human", "Retrieved FAQs:\n{context}\n\nUser Question: {question}")
+        ])
+    
+    def _format_context(self, docs):
+        """Format documents"""
+        return "\n\n".join(
+            f"Intent: {doc.metadata['intent']}\nQ: {doc.metadata['question']}\nA: {doc.metadata['answer']}"
+            for doc in docs
         )
+    
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Normalize question text for cache lookups"""
+        return re.sub(r'\s+', ' ', question.strip().lower())
+    
+    def _get_cached_response(self, key: str):
+        """Return cached result for key, or None if missing/expired"""
+        with self._exact_cache_lock:
+            entry = self._exact_cache.get(key)
+            if entry is None:
+                return None
+            
+            timestamp, result = entry
+            if time.monotonic() - timestamp > self.response_cache_ttl:
+                del self._exact_cache[key]
+                return None
+            
+            self._exact_cache.move_to_end(key)
+            return result
+    
+    def _store_cached_response(self, key: str, result: dict, timestamp: float = None):
+        """Store result in the exact-match cache, evicting the oldest entry"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._exact_cache_lock:
+            self._exact_cache[key] = (timestamp, result)
+            self._exact_cache.move_to_end(key)
+            while len(self._exact_cache) > self.response_cache_size:
+                self._exact_cache.popitem(last=False)
+    
+    async def query(self, question: str, return_sources: bool = False):
+        """Query the RAG system"""
+        cache_key = self._normalize_question(question)
+        result = self._get_cached_response(cache_key)
         
-        response = await rag_chain.ainvoke(question)
+        if result is None:
+            # Keep the answer's original age so a semantic hit can't outlive the TTL
+            timestamp, result = await self._answer(question)
+            self._store_cached_response(cache_key, result, timestamp)
         
         if return_sources:
-            return {
-                "response": response,
-                "sources": [
-                    {
-                        "intent": doc.metadata['intent'],
-                        "question": doc.metadata['question'],
-                        "answer": doc.metadata['answer']
-                    }
-                    for doc in retrieved_docs
-                ]
-            }
-        
-        return response
+            return result
+        
+        return result["response"]
+    
+    async def _retrieve(self, query_vector):
+        """Retrieve FAQs for an already-embedded question"""
+        # The index lives in memory; searching inline is cheaper than an executor hop
+        search_kwargs = self.retriever.search_kwargs
+        if self.retriever.search_type == "mmr":
+            return self.vectorstore.max_marginal_relevance_search_by_vector(
+                query_vector, **search_kwargs
+            )
+        return self.vectorstore.similarity_search_by_vector(
+            query_vector, **search_kwargs
+        )
+    
+    async def _answer(self, question: str):
+        """Run retrieval and generation; returns (timestamp, result)"""
+        # Embed once: the vector serves both the semantic cache and retrieval
+        query_vector = await self.embeddings.aembed_query(question)
+        
+        cached = self.semantic_cache.lookup(query_vector)
+        if cached is not None:
+            return cached
+        
+        retrieved_docs = await self._retrieve(query_vector)
+        
+        messages = self.rag_prompt.format_messages(
+            context=self._format_context(retrieved_docs),
+            question=question
+        )
+        response = await self.structured_llm.ainvoke(messages)
+        
+        result = {
+            "response": response,
+            "sources": [
+                {
+                    "intent": doc.metadata['intent'],
+                    "question": doc.metadata['question'],
+                    "answer": doc.metadata['answer']
+                }
+                for doc in retrieved_docs
+            ]
+        }
+        self.semantic_cache.add(query_vector, result)
+        
+        return time.monotonic(), result
+    
+    async def prefetch_related(self, intent: str):
+        """Warm the response caches for likely follow-up intents"""
+        for next_intent in INTENT_FOLLOW_UPS.get(intent, ())[:PREFETCH_INTENTS]:
+            question = self._canonical_questions.get(next_intent)
+            if question is None:
+                continue
+            
+            key = self._normalize_question(question)
+            if key in self._prefetching or self._get_cached_response(key) is not None:
+                continue
+            
+            self._prefetching.add(key)
+            try:
+                await self.query(question)
+            except Exception as e:
+                print(f"⚠️ Prefetch failed for {next_intent}: {e}")
+            finally:
+                self._prefetching.discard(key)
+    
+    async def aclose(self):
+        """Close pooled HTTP connections"""
+        await self._http.aclose()
     
     def get_all_intents(self):
         """Get all intent categories"""
-        if self.faq_df is None:
-            self._load_csv_data()
-        return self.faq_df['Intent'].unique().tolist()
\ No newline at end of file
+        if self._intents_cache is None:
+            if self.faq_df is None:
+                self._load_csv_data()
+            self._intents_cache = tuple(self.faq_df['Intent'].unique())
+        return self._intents_cache
\ No newline at end of file
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import numpy as np
+
+# Random-hyperplane LSH: each table hashes a query to the sign pattern of
+# LSH_BITS fixed Gaussian projections. Two vectors at cosine 0.92 share a
+# bucket in at least one of 12 tables ~99% of the time, while a lookup
+# scores only ~5% of the rows.
+LSH_TABLES = 12
+LSH_BITS = 8
+
+
+class SemanticCache:
+    """Embedding-similarity cache of RAG results"""
+
+    def __init__(
+        self,
+        dim: int,
+        threshold: float = 0.92,
+        max_size: int = 5000,
+        ttl: float = 3600,
+        seed: int = 0
+    ):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # Fixed slots: one L2-normalized query embedding per row. Slots are
+        # overwritten in place on eviction, so row indices never shift.
+        self._matrix = np.zeros((max_size, dim), dtype=np.float32)
+        self._results = [None] * max_size
+        self._created = np.zeros(max_size, dtype=np.float64)
+        self._last_used = np.zeros(max_size, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+        # Per LSH table: bucket key -> slots. Only these candidates are scored.
+        self._planes = np.random.default_rng(seed).standard_normal(
+            (dim, LSH_TABLES * LSH_BITS)
+        ).astype(np.float32)
+        self._bit_weights = 1 << np.arange(LSH_BITS)
+        self._keys_of_row = [None] * max_size
+        self._buckets = [{} for _ in range(LSH_TABLES)]
+
+    def __len__(self):
+        return self._size
+
+    @staticmethod
+    def _normalize(vector):
+        """Convert an embedding to a unit-length float32 array"""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _bucket_keys(self, vector):
+        """LSH bucket key of vector in each table"""
+        signs = (vector @ self._planes > 0).reshape(LSH_TABLES, LSH_BITS)
+        return tuple((signs @ self._bit_weights).tolist())
+
+    def _best_row(self, query, now, rows):
+        """Slot of the best live row at or above threshold, or None"""
+        rows = np.fromiter(rows, dtype=np.intp, count=len(rows))
+        scores = self._matrix[rows] @ query
+        scores[now - self._created[rows] > self.ttl] = -np.inf
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+        return int(rows[best])
+
+    def lookup(self, vector):
+        """Return (timestamp, result) of the most similar live entry, or None"""
+        query = self._normalize(vector)
+        keys = self._bucket_keys(query)
+        now = time.monotonic()
+
+        with self._lock:
+            rows = set()
+            for table, key in zip(self._buckets, keys):
+                rows.update(table.get(key, ()))
+            if not rows:
+                return None
+
+            best = self._best_row(query, now, rows)
+            if best is None:
+                return None
+
+            self._clock += 1
+            self._last_used[best] = self._clock
+            return self._created[best], self._results[best]
+
+    def add(self, vector, result):
+        """Store result under the given query embedding"""
+        row = self._normalize(vector)
+        keys = self._bucket_keys(row)
+        now = time.monotonic()
+
+        with self._lock:
+            slot = self._free_slot(now)
+
+            old_keys = self._keys_of_row[slot]
+            if old_keys is not None:
+                for table, key in zip(self._buckets, old_keys):
+                    table[key].discard(slot)
+
+            self._clock += 1
+            self._matrix[slot] = row
+            self._results[slot] = result
+            self._created[slot] = now
+            self._last_used[slot] = self._clock
+
+            self._keys_of_row[slot] = keys
+            for table, key in zip(self._buckets, keys):
+                table.setdefault(key, set()).add(slot)
+
+    def _free_slot(self, now):
+        """Next empty slot, else an expired one, else the least recently used"""
+        if self._size < self.max_size:
+            self._size += 1
+            return self._size - 1
+
+        expired = now - self._created > self.ttl
+        if expired.any():
+            return int(expired.argmax())
+        return int(self._last_used.argmin())
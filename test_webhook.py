@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 """
-Simple test script to verify webhook logic without running Flask server
+Simple test script to verify webhook logic without running the Quart server
 """
 
 import asyncio
 import sys
 from src.rag_faq_bot import RAGFAQBot
-from api.whatsapp_webhook import run_async_query, format_whatsapp_response
+from api.whatsapp_webhook import format_whatsapp_response
 
 async def test_query():
     """Test the async query functionality"""
@@ -28,10 +28,10 @@ async def test_query():
         print(f"   Answer: {result['response'].answer[:100]}...")
         print(f"   Sources: {len(result.get('sources', []))} documents")
         
-        # Test sync wrapper
-        print("\n2️⃣ Testing sync wrapper (run_async_query)...")
-        result2 = run_async_query(bot, test_question)
-        print(f"✅ Sync wrapper successful!")
+        # Test repeated query (served from the response cache)
+        print("\n2️⃣ Testing repeated query...")
+        result2 = await bot.query(test_question, return_sources=True)
+        print(f"✅ Repeated query successful!")
         print(f"   Intent: {result2['response'].intent}")
         print(f"   Answer: {result2['response'].answer[:100]}...")
         
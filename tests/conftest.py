@@ -0,0 +1,51 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.rag_faq_bot as rag_faq_bot
+from source.schemas import FAQAIResponse
+
+DATA_CSV = Path(__file__).resolve().parent.parent / "data" / "synthetic_faq_dataset.csv"
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    def __init__(self, dimensions, **kwargs):
+        super().__init__(size=dimensions)
+
+
+class FakeStructuredLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return FAQAIResponse(intent="Hostel", answer=f"answer {self.calls}")
+
+
+class FakeChatOpenAI:
+    def __init__(self, **kwargs):
+        pass
+
+    def with_structured_output(self, *args, **kwargs):
+        return FakeStructuredLLM()
+
+
+@pytest.fixture(scope="module")
+def make_bot():
+    """Build RAGFAQBot instances on the FAQ dataset with OpenAI faked out"""
+    bots = []
+
+    def make_bot(**kwargs):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setenv("OPENAI_API_KEY", "sk-test")
+            mp.setattr(rag_faq_bot, "OpenAIEmbeddings", FakeEmbeddings)
+            mp.setattr(rag_faq_bot, "ChatOpenAI", FakeChatOpenAI)
+            bot = rag_faq_bot.RAGFAQBot(csv_path=str(DATA_CSV), **kwargs)
+        bots.append(bot)
+        return bot
+
+    yield make_bot
+    for bot in bots:
+        asyncio.run(bot.aclose())
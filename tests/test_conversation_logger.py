@@ -0,0 +1,105 @@
+import csv
+import sqlite3
+
+import pytest
+
+import src.conversation_logger as conversation_logger
+from src.conversation_logger import ConversationLogger
+
+CSV_COLUMNS = ['timestamp', 'user_id', 'user_question', 'predicted_intent', 'confidence', 'response']
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / 'data' / 'whatsapp_logs.db')
+
+
+@pytest.fixture
+def open_logger(log_file):
+    loggers = []
+
+    def open_logger():
+        logger = ConversationLogger(log_file)
+        loggers.append(logger)
+        return logger
+
+    yield open_logger
+    for logger in loggers:
+        logger.close()
+
+
+def count_rows(log_file):
+    with sqlite3.connect(log_file) as conn:
+        return conn.execute('SELECT COUNT(*) FROM logs').fetchone()[0]
+
+
+def test_empty_analytics(open_logger):
+    assert open_logger().get_analytics() == {
+        'total_interactions': 0,
+        'unique_users': 0,
+        'top_intents': {}
+    }
+
+
+def test_analytics(open_logger):
+    logger = open_logger()
+    logger.log_interaction('Hostel fee?', 'Hostel', 0.9, user_id='a')
+    logger.log_interaction('Hostel rooms?', 'Hostel', 0.7, user_id='b')
+    logger.log_interaction('Library timings?', 'Library', 0.5, user_id='a')
+
+    analytics = logger.get_analytics()
+
+    assert analytics['total_interactions'] == 3
+    assert analytics['unique_users'] == 2
+    assert analytics['average_confidence'] == pytest.approx(0.7)
+    assert analytics['top_intents'] == {'Hostel': 2, 'Library': 1}
+    assert sum(analytics['daily_volume'].values()) == 3
+
+
+def test_rows_are_written_in_batches(open_logger, monkeypatch):
+    logger = open_logger()
+    batches = []
+    write_rows = logger._write_rows
+
+    def record_batch(rows):
+        batches.append(len(rows))
+        write_rows(rows)
+
+    monkeypatch.setattr(logger, '_write_rows', record_batch)
+    # Hold the writer off the queue until every row is in
+    with logger._db_lock:
+        for i in range(250):
+            logger.log_interaction(f'q{i}', 'Fees', 0.5, user_id=str(i))
+    logger.flush()
+
+    assert max(batches) == conversation_logger.BATCH_SIZE
+    assert sum(batches) == 250
+    assert logger.get_analytics()['total_interactions'] == 250
+
+
+def test_close_writes_queued_rows(open_logger, log_file):
+    logger = open_logger()
+    for i in range(500):
+        logger.log_interaction(f'q{i}', 'Fees', 0.5, user_id=str(i))
+    logger.close()
+
+    assert count_rows(log_file) == 500
+
+
+def test_imports_legacy_csv_once(open_logger, log_file, tmp_path):
+    csv_file = tmp_path / 'data' / 'whatsapp_logs.csv'
+    csv_file.parent.mkdir()
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerow(['2024-03-01T10:00:00', 'a', 'Fee?', 'Fee_Structure', '0.8', 'Rs. 50,000'])
+        writer.writerow(['2024-03-02T11:00:00', '', 'Hi', 'Contact', '', ''])
+
+    analytics = open_logger().get_analytics()
+    assert analytics['total_interactions'] == 2
+    assert analytics['unique_users'] == 1
+    assert analytics['average_confidence'] == pytest.approx(0.8)
+    assert analytics['daily_volume'] == {'2024-03-01': 1, '2024-03-02': 1}
+
+    open_logger()
+    assert count_rows(log_file) == 2
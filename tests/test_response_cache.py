@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+import src.rag_faq_bot as rag_faq_bot
+from src.semantic_cache import SemanticCache
+
+TTL = 60
+
+
+class OffsetClock:
+    """time.monotonic that can be moved forward"""
+
+    def __init__(self, monotonic):
+        self._monotonic = monotonic
+        self.offset = 0.0
+
+    def __call__(self):
+        return self._monotonic() + self.offset
+
+
+@pytest.fixture(scope="module")
+def built_bot(make_bot, tmp_path_factory):
+    return make_bot(
+        persist_directory=str(tmp_path_factory.mktemp("index") / "faiss_index"),
+        use_cache=False,
+        response_cache_ttl=TTL
+    )
+
+
+@pytest.fixture
+def bot(built_bot):
+    built_bot.response_cache_size = 2
+    built_bot._exact_cache.clear()
+    built_bot.semantic_cache = SemanticCache(
+        dim=rag_faq_bot.EMBEDDING_DIMENSIONS,
+        ttl=TTL
+    )
+    built_bot.structured_llm.calls = 0
+    return built_bot
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = OffsetClock(time.monotonic)
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+def test_cached_response_expires_after_ttl(bot, clock):
+    bot._store_cached_response("fees", {"answer": 1})
+
+    clock.offset += TTL - 1
+    assert bot._get_cached_response("fees") == {"answer": 1}
+    clock.offset += 2
+    assert bot._get_cached_response("fees") is None
+    assert "fees" not in bot._exact_cache
+
+
+def test_cached_response_keeps_given_timestamp(bot, clock):
+    bot._store_cached_response("fees", {"answer": 1}, timestamp=time.monotonic() - TTL - 1)
+
+    assert bot._get_cached_response("fees") is None
+
+
+def test_least_recently_used_response_is_evicted(bot):
+    bot._store_cached_response("fees", {"answer": 1})
+    bot._store_cached_response("hostel", {"answer": 2})
+    bot._get_cached_response("fees")
+    bot._store_cached_response("library", {"answer": 3})
+
+    assert list(bot._exact_cache) == ["fees", "library"]
+    assert bot._get_cached_response("hostel") is None
+
+
+def test_query_answers_repeated_question_from_cache(bot):
+    first = asyncio.run(bot.query("When do admissions open?"))
+    second = asyncio.run(bot.query("  when do ADMISSIONS   open? "))
+
+    assert second is first
+    assert bot.structured_llm.calls == 1
+
+
+def test_query_answers_again_after_ttl(bot, clock):
+    asyncio.run(bot.query("When do admissions open?"))
+    clock.offset += TTL + 1
+    result = asyncio.run(bot.query("When do admissions open?"))
+
+    assert result.answer == "answer 2"
+    assert bot.structured_llm.calls == 2
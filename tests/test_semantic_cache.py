@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+import src.semantic_cache as semantic_cache
+from src.semantic_cache import SemanticCache
+
+DIM = 64
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(semantic_cache.time, "monotonic", clock)
+    return clock
+
+
+def random_unit(rng):
+    vector = rng.standard_normal(DIM)
+    return vector / np.linalg.norm(vector)
+
+
+def neighbour(vector, cosine, rng):
+    """Unit vector at the given cosine similarity to vector"""
+    noise = rng.standard_normal(DIM)
+    noise -= noise @ vector * vector
+    noise /= np.linalg.norm(noise)
+    return cosine * vector + np.sqrt(1 - cosine ** 2) * noise
+
+
+def test_hit_at_or_above_threshold(clock):
+    rng = np.random.default_rng(1)
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    query = random_unit(rng)
+    cache.add(query, "answer")
+
+    assert cache.lookup(query) == (clock.now, "answer")
+    assert cache.lookup(neighbour(query, 0.97, rng))[1] == "answer"
+
+
+def test_miss_below_threshold(clock):
+    rng = np.random.default_rng(2)
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    query = random_unit(rng)
+    cache.add(query, "answer")
+
+    assert cache.lookup(neighbour(query, 0.8, rng)) is None
+
+
+def test_returns_most_similar_entry(clock):
+    rng = np.random.default_rng(3)
+    cache = SemanticCache(dim=DIM, threshold=0.5)
+    query = random_unit(rng)
+    cache.add(neighbour(query, 0.9, rng), "further")
+    cache.add(neighbour(query, 0.99, rng), "closer")
+
+    assert cache.lookup(query)[1] == "closer"
+
+
+def test_entries_expire_after_ttl(clock):
+    rng = np.random.default_rng(4)
+    cache = SemanticCache(dim=DIM, ttl=60)
+    query = random_unit(rng)
+    cache.add(query, "answer")
+
+    clock.now += 59
+    assert cache.lookup(query) == (clock.now - 59, "answer")
+    clock.now += 2
+    assert cache.lookup(query) is None
+
+
+def test_expired_slot_is_reused_before_lru(clock):
+    rng = np.random.default_rng(5)
+    cache = SemanticCache(dim=DIM, max_size=2, ttl=60)
+    old, fresh, new = (random_unit(rng) for _ in range(3))
+    cache.add(old, "old")
+    clock.now += 30
+    cache.add(fresh, "fresh")
+    # Make the expiring entry the most recently used one
+    cache.lookup(old)
+
+    clock.now += 31
+    cache.add(new, "new")
+
+    assert len(cache) == 2
+    assert cache.lookup(fresh)[1] == "fresh"
+    assert cache.lookup(new)[1] == "new"
+
+
+def test_evicts_least_recently_used(clock):
+    rng = np.random.default_rng(6)
+    cache = SemanticCache(dim=DIM, max_size=2)
+    first, second, third = (random_unit(rng) for _ in range(3))
+    cache.add(first, "first")
+    cache.add(second, "second")
+    cache.lookup(first)
+
+    cache.add(third, "third")
+
+    assert len(cache) == 2
+    assert cache.lookup(second) is None
+    assert cache.lookup(first)[1] == "first"
+    assert cache.lookup(third)[1] == "third"
+
+
+def test_bucket_keys_are_per_table_and_seeded():
+    rng = np.random.default_rng(7)
+    query = random_unit(rng)
+    keys = SemanticCache(dim=DIM, seed=3)._bucket_keys(query)
+
+    assert len(keys) == semantic_cache.LSH_TABLES
+    assert all(0 <= key < 2 ** semantic_cache.LSH_BITS for key in keys)
+    assert SemanticCache(dim=DIM, seed=3)._bucket_keys(query) == keys
+
+
+def test_lookup_only_scores_rows_sharing_a_bucket(clock):
+    rng = np.random.default_rng(8)
+    # Every stored row clears this threshold, so a miss can only come from LSH
+    cache = SemanticCache(dim=DIM, threshold=-1.0)
+    query = random_unit(rng)
+    cache.add(query, "answer")
+
+    # Negating a vector flips every hyperplane sign, so it shares no bucket
+    assert cache.lookup(-query) is None
+    assert cache.lookup(query)[1] == "answer"
+
+
+def test_evicted_row_leaves_its_buckets(clock):
+    rng = np.random.default_rng(9)
+    cache = SemanticCache(dim=DIM, max_size=1)
+    old, new = random_unit(rng), random_unit(rng)
+    cache.add(old, "old")
+    cache.add(new, "new")
+
+    new_keys = cache._bucket_keys(cache._normalize(new))
+    for table, key in zip(cache._buckets, new_keys):
+        assert {k for k, slots in table.items() if slots} == {key}
+    assert cache.lookup(old) is None
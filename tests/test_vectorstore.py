@@ -0,0 +1,55 @@
+import pytest
+
+import src.rag_faq_bot as rag_faq_bot
+
+
+@pytest.fixture(scope="module")
+def bot(make_bot, tmp_path_factory):
+    return make_bot(persist_directory=str(tmp_path_factory.mktemp("index") / "faiss_index"))
+
+
+@pytest.fixture
+def persist_path(bot, tmp_path):
+    persist_path = tmp_path / "faiss_index"
+    bot.persist_directory = str(persist_path)
+    return persist_path
+
+
+def leftovers(persist_path):
+    return sorted(p.name for p in persist_path.parent.iterdir() if p != persist_path)
+
+
+def test_first_published_index_is_kept(bot, persist_path):
+    bot._save_vectorstore()
+    marker = persist_path / "first"
+    marker.touch()
+
+    bot._save_vectorstore()
+
+    assert marker.exists()
+    assert sorted(p.name for p in persist_path.iterdir()) == ["first", "index.faiss", "index.pkl"]
+    assert leftovers(persist_path) == []
+
+
+def test_replace_publishes_new_index(bot, persist_path):
+    bot._save_vectorstore()
+    marker = persist_path / "first"
+    marker.touch()
+
+    bot._save_vectorstore(replace=True)
+
+    assert not marker.exists()
+    assert sorted(p.name for p in persist_path.iterdir()) == ["index.faiss", "index.pkl"]
+    assert leftovers(persist_path) == []
+
+
+def test_index_with_other_dimension_is_rebuilt(make_bot, tmp_path, monkeypatch):
+    persist_directory = str(tmp_path / "faiss_index")
+    monkeypatch.setattr(rag_faq_bot, "EMBEDDING_DIMENSIONS", 256)
+    make_bot(persist_directory=persist_directory)
+
+    monkeypatch.setattr(rag_faq_bot, "EMBEDDING_DIMENSIONS", 512)
+    bot = make_bot(persist_directory=persist_directory)
+
+    assert bot.vectorstore.index.d == 512
+    assert make_bot(persist_directory=persist_directory).vectorstore.index.d == 512
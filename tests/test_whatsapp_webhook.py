@@ -0,0 +1,40 @@
+import asyncio
+import importlib
+import xml.etree.ElementTree as ET
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def webhook(tmp_path_factory):
+    # The module opens its conversation log under ./data on import
+    with pytest.MonkeyPatch.context() as mp:
+        workdir = tmp_path_factory.mktemp("webhook")
+        (workdir / "data").mkdir()
+        mp.chdir(workdir)
+        module = importlib.import_module("api.whatsapp_webhook")
+    yield module
+    module.logger.close()
+
+
+def reply_text(response):
+    body = asyncio.run(response.get_data(as_text=True))
+    return ET.fromstring(body).find("Message").text
+
+
+def test_respond_whatsapp_returns_twiml(webhook):
+    response = webhook.respond_whatsapp("Hello")
+
+    assert response.content_type.startswith("text/xml")
+    assert reply_text(response) == "Hello"
+
+
+@pytest.mark.parametrize("message", [
+    "Fee < Rs. 50,000 & hostel > 2 km",
+    "<Redirect>http://example.com</Redirect>",
+    "Reply with \"help\" or 'menu'",
+])
+def test_respond_whatsapp_escapes_message(webhook, message):
+    response = webhook.respond_whatsapp(message)
+
+    assert reply_text(response) == message